@@ -1,6 +1,8 @@
 from flask import Blueprint, jsonify, request, current_app
 from app.infrastructure.db.mongo_client import mongo
+from app.utils.event_bus import get_stats as get_event_bus_stats
 from app.utils.logger import get_logger
+from app.utils.singleflight import get_stats as get_singleflight_stats
 
 bp = Blueprint("check", __name__, url_prefix="/check")
 logger = get_logger(__name__)
@@ -31,3 +33,10 @@ def debug():
         "args": request.args,
         "env": current_app.config.get("FLASK_ENV", "unknown"),
     })
+
+@bp.route("/metrics", methods=["GET"])
+def metrics():
+    return jsonify({
+        "singleflight": get_singleflight_stats(),
+        "event_bus": get_event_bus_stats(),
+    })
@@ -1,4 +1,6 @@
-from flask import Blueprint, request
+import json
+
+from flask import Blueprint, Response, request, stream_with_context
 from app.core.services import post_service
 from app.utils.logger import get_logger
 from app.utils.exceptions.response import success_response, error_response
@@ -25,6 +27,94 @@ def create():
         logger.error(f"Unknown error: {e}")
         return error_response(str(e), code=500)
 
+@bp.route("/stats", methods=["GET"])
+def stats():
+    try:
+        days = request.args.get("days", "30")
+        days = int(days) if days.isdigit() else None
+        result = post_service.get_post_stats(days)
+        return success_response(result)
+    except ValidationError as ve:
+        logger.warning(f"Stats validation error: {ve}")
+        return error_response(str(ve), code=422)
+    except Exception as e:
+        logger.error(f"Stats: Unknown error: {e}")
+        return error_response(str(e), code=500)
+
+@bp.route("/changes", methods=["GET"])
+def changes():
+    ops = [op for op in request.args.get("ops", "").split(",") if op]
+    resume_token = request.headers.get("Last-Event-ID") or request.args.get(
+        "resume_token"
+    )
+    try:
+        events = post_service.stream_post_changes(ops, resume_token)
+    except ValidationError as ve:
+        logger.warning(f"Changes validation error: {ve}")
+        return error_response(str(ve), code=422)
+    except Exception as e:
+        logger.error(f"Changes: Unknown error: {e}")
+        return error_response(str(e), code=500)
+
+    def generate():
+        try:
+            yield "retry: 3000\n\n"
+            for event in events:
+                if event is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                lines = []
+                if event["token"]:
+                    lines.append(f"id: {event['token']}")
+                lines.append(f"event: {event['op']}")
+                lines.append(f"data: {json.dumps(event)}")
+                yield "\n".join(lines) + "\n\n"
+        except Exception as e:
+            # Headers are already sent; end the stream and let the client retry
+            logger.error(f"Changes: stream error: {e}")
+        finally:
+            events.close()
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@bp.route("/bulk/update", methods=["POST"])
+def bulk_update():
+    try:
+        data = request.json
+        report = post_service.bulk_update_posts(data)
+        logger.info(f"API: Bulk update modified {report['modified']} posts")
+        return success_response(report, message="Updated")
+    except ValidationError as ve:
+        logger.warning(f"Bulk update validation error: {ve}")
+        return error_response(str(ve), code=422)
+    except DatabaseException as de:
+        logger.error(f"Bulk update database error: {de}")
+        return error_response(str(de), code=500)
+    except Exception as e:
+        logger.error(f"Bulk update: Unknown error: {e}")
+        return error_response(str(e), code=500)
+
+@bp.route("/bulk/delete", methods=["POST"])
+def bulk_delete():
+    try:
+        data = request.json
+        report = post_service.bulk_delete_posts(data)
+        logger.info(f"API: Bulk delete removed {report['deleted']} posts")
+        return success_response(report, message="Deleted")
+    except ValidationError as ve:
+        logger.warning(f"Bulk delete validation error: {ve}")
+        return error_response(str(ve), code=422)
+    except DatabaseException as de:
+        logger.error(f"Bulk delete database error: {de}")
+        return error_response(str(de), code=500)
+    except Exception as e:
+        logger.error(f"Bulk delete: Unknown error: {e}")
+        return error_response(str(e), code=500)
+
 @bp.route("/<post_id>", methods=["GET"])
 def read(post_id):
     try:
@@ -38,6 +128,44 @@ def read(post_id):
         logger.error(f"Read: Unknown error: {e}")
         return error_response(str(e), code=500)
 
+@bp.route("/<post_id>/content", methods=["GET"])
+def read_content(post_id):
+    try:
+        content = post_service.get_post_content(post_id)
+    except NotFoundError as nf:
+        logger.warning(f"Read content: {nf}")
+        return error_response(str(nf), code=404)
+    except Exception as e:
+        logger.error(f"Read content: Unknown error: {e}")
+        return error_response(str(e), code=500)
+
+    size = content["size"]
+    start, stop, status = 0, size, 200
+    headers = {"Accept-Ranges": "bytes", "ETag": f'"{content["version"]}"'}
+    # If-Range naming another body (or a date) gets the full body, so a resumed
+    # download never splices two versions together
+    same_body = "If-Range" not in request.headers or (
+        request.if_range.etag == content["version"]
+    )
+    # Only single byte ranges are honoured; anything else gets the full body
+    if same_body and request.range is not None and len(request.range.ranges) == 1:
+        byte_range = request.range.range_for_length(size)
+        if byte_range is None:
+            headers["Content-Range"] = f"bytes */{size}"
+            body, code = error_response("Requested range not satisfiable", code=416)
+            return body, code, headers
+        start, stop = byte_range
+        status = 206
+        headers["Content-Range"] = f"bytes {start}-{stop - 1}/{size}"
+    headers["Content-Length"] = str(stop - start)
+    chunks = post_service.iter_post_content(content, start, stop)
+    return Response(
+        stream_with_context(chunks),
+        status=status,
+        mimetype="text/plain",
+        headers=headers,
+    )
+
 @bp.route("/<post_id>", methods=["PUT"])
 def update(post_id):
     try:
@@ -0,0 +1,126 @@
+from datetime import datetime, timezone
+
+from bson import ObjectId
+from pymongo.errors import OperationFailure
+from app.infrastructure.config import get_config
+from app.infrastructure.db.mongo_client import get_collection
+from app.utils.logger import get_logger
+from app.utils.exceptions.db_exceptions import DatabaseException
+
+logger = get_logger(__name__)
+_config = get_config()
+chunks = get_collection("post_chunks")
+chunks.create_index([("files_id", 1), ("n", 1)], unique=True)
+
+
+def _ensure_grace_index(seconds):
+    """
+    Released chunks are only marked; a TTL index deletes them after the grace
+    period. A changed grace period is applied to the existing index in place.
+    """
+    try:
+        chunks.create_index("superseded_at", expireAfterSeconds=seconds)
+    except OperationFailure as e:
+        logger.warning(f"Updating content chunk TTL to {seconds}s: {e}")
+        try:
+            chunks.database.command(
+                {
+                    "collMod": chunks.name,
+                    "index": {
+                        "keyPattern": {"superseded_at": 1},
+                        "expireAfterSeconds": seconds,
+                    },
+                }
+            )
+        except Exception as e:
+            # Keep serving; superseded chunks just expire on the old schedule
+            logger.error(f"Failed to update content chunk TTL: {e}")
+
+
+_ensure_grace_index(_config.POST_CONTENT_CHUNK_GRACE_SECONDS)
+
+# Fields on a post document that describe out-of-line content
+CHUNK_FIELDS = ("content_file_id", "content_chunk_size")
+
+
+def split_content(data, config=None):
+    """
+    Split large content out of post data (GridFS-style).
+    Return (doc, body): body is the UTF-8 content to store in chunks, or None
+    when the content is small enough to stay inline (doc is then data itself).
+    """
+    config = config or _config
+    content = data.get("content") if isinstance(data, dict) else None
+    if not isinstance(content, str):
+        return data, None
+    body = content.encode("utf-8")
+    if len(body) <= config.POST_CONTENT_CHUNK_THRESHOLD:
+        return data, None
+    doc = {k: v for k, v in data.items() if k != "content"}
+    doc["content_preview"] = content[: config.POST_CONTENT_PREVIEW_CHARS]
+    doc["content_size"] = len(body)
+    doc["content_chunked"] = True
+    return doc, body
+
+
+def save_chunks(body, config=None):
+    """Store body in chunks under a new file id. Return the fields for the post doc."""
+    config = config or _config
+    chunk_size = config.POST_CONTENT_CHUNK_SIZE
+    file_id = ObjectId()
+    docs = [
+        {"files_id": file_id, "n": n, "data": body[offset : offset + chunk_size]}
+        for n, offset in enumerate(range(0, len(body), chunk_size))
+    ]
+    chunks.insert_many(docs, ordered=False)
+    logger.info(f"Stored {len(docs)} content chunks: {file_id}")
+    return {"content_file_id": file_id, "content_chunk_size": chunk_size}
+
+
+def release_chunks(file_ids):
+    """
+    Mark the chunks of superseded bodies for removal. Readers still streaming
+    them keep working until the TTL index deletes them after the grace period.
+    """
+    file_ids = [file_id for file_id in file_ids if file_id is not None]
+    if not file_ids:
+        return 0
+    result = chunks.update_many(
+        {"files_id": {"$in": file_ids}},
+        {"$set": {"superseded_at": datetime.now(timezone.utc)}},
+    )
+    logger.info(f"Released {result.modified_count} content chunks: {file_ids}")
+    return result.modified_count
+
+
+def delete_chunks(file_id):
+    """Delete chunks right away; only for bodies no reader has seen."""
+    if file_id is None:
+        return 0
+    result = chunks.delete_many({"files_id": file_id})
+    logger.info(f"Deleted {result.deleted_count} content chunks: {file_id}")
+    return result.deleted_count
+
+
+def iter_chunks(file_id, chunk_size, start, stop):
+    """Yield the bytes in [start, stop) of a chunked body, one chunk at a time."""
+    if start >= stop:
+        return
+    first, last = start // chunk_size, (stop - 1) // chunk_size
+    cursor = chunks.find(
+        {"files_id": file_id, "n": {"$gte": first, "$lte": last}},
+        {"_id": 0, "n": 1, "data": 1},
+    ).sort("n", 1)
+    # Small batches keep only a few chunks in memory at a time
+    expected = first
+    for chunk in cursor.batch_size(4):
+        if chunk["n"] != expected:
+            break
+        expected += 1
+        offset = chunk["n"] * chunk_size
+        data = bytes(chunk["data"])
+        yield data[max(start - offset, 0) : stop - offset]
+    # Fail rather than silently truncate a body whose chunks are gone
+    if expected != last + 1:
+        logger.error(f"Content chunk {expected} missing: {file_id}")
+        raise DatabaseException(f"Post content chunk {expected} is missing")
@@ -1,28 +1,75 @@
+import hashlib
+import itertools
+import time
+
 from bson import ObjectId
-from app.infrastructure.db.mongo_client import get_collection
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, OperationFailure, PyMongoError
+from app.core.repositories import post_content_repository as content_repo
+from app.core.repositories import post_stats_repository as stats_repo
+from app.infrastructure.config import get_config
+from app.infrastructure.db.mongo_client import get_collection, get_collection_for
 from app.utils.logger import get_logger
+from app.utils.event_bus import EventBus
+from app.utils.singleflight import SingleFlight
 from app.utils.exceptions.db_exceptions import NotFoundError, DatabaseException
 
 logger = get_logger(__name__)
+_config = get_config()
 collection = get_collection("posts")
+# Per-operation views of the collection with their configured read/write policy
+_collections = {
+    operation: get_collection_for("posts", operation)
+    for operation in ("get", "create", "update", "delete", "bulk_update", "bulk_delete")
+}
+# Concurrent reads for the same post share one find_one call
+_post_reads = SingleFlight("posts.get_post")
+# Fields describing out-of-line content; set on chunked posts only
+_CHUNKED_FIELDS = ("content_preview", "content_size", "content_chunked")
+_INTERNAL_PROJECTION = {field: 0 for field in content_repo.CHUNK_FIELDS}
+# In-process feed of post writes, the change feed fallback without change streams
+post_events = EventBus("posts", history_size=_config.CHANGE_FEED_HISTORY_SIZE)
+# Change stream operation types per change feed op
+_CHANGE_STREAM_OPS = {
+    "create": ["insert"],
+    "update": ["update", "replace"],
+    "delete": ["delete"],
+}
+# Server error codes meaning change streams are unavailable (standalone server)
+_CHANGE_STREAM_UNSUPPORTED_CODES = (40573, 40324)
 
 def create_post(data):
+    file_id = None
     try:
-        result = collection.insert_one(data)
+        doc, body = content_repo.split_content(data)
+        if body is not None:
+            doc.update(content_repo.save_chunks(body))
+            file_id = doc["content_file_id"]
+        result = _collections["create"].insert_one(doc)
         logger.info(f"Post created: {result.inserted_id}")
+        _forget_reads([result.inserted_id])
+        _record_stats(stats_repo.record_created, [result.inserted_id])
+        _publish("create", result.inserted_id)
         return str(result.inserted_id)
     except Exception as e:
+        _discard_chunks(file_id)
         logger.error(f"Failed to create post: {e}")
         raise DatabaseException(str(e))
 
 def get_post(post_id):
     try:
         obj_id = ObjectId(post_id)
-        result = collection.find_one({"_id": obj_id})
+        result = _post_reads.do(
+            str(obj_id),
+            lambda: _collections["get"].find_one(
+                {"_id": obj_id}, _INTERNAL_PROJECTION
+            ),
+        )
         if not result:
             logger.warning(f"Post not found: {post_id}")
             raise NotFoundError("Post not found")
-        return result
+        # Each caller gets its own copy since the document may be shared
+        return dict(result)
     except NotFoundError:
         raise
     except Exception as e:
@@ -30,31 +77,368 @@ def get_post(post_id):
         raise DatabaseException(str(e))
 
 def update_post(post_id, data):
+    file_id = None
     try:
         obj_id = ObjectId(post_id)
-        result = collection.update_one({"_id": obj_id}, {"$set": data})
-        if result.matched_count == 0:
+        doc, body = content_repo.split_content(data)
+        if body is not None:
+            doc.update(content_repo.save_chunks(body))
+            file_id = doc["content_file_id"]
+            unset = ["content"]
+        else:
+            unset = [
+                f for f in _CHUNKED_FIELDS + content_repo.CHUNK_FIELDS if f not in doc
+            ]
+        update = {"$set": doc}
+        if unset:
+            update["$unset"] = {field: "" for field in unset}
+        # Return the previous chunk file id so its chunks can be released
+        previous = _collections["update"].find_one_and_update(
+            {"_id": obj_id},
+            update,
+            projection={"content_file_id": 1},
+            return_document=ReturnDocument.BEFORE,
+        )
+        if previous is None:
             logger.warning(f"Post to update not found: {post_id}")
             raise NotFoundError("Post not found")
+        _forget_reads([obj_id])
+        content_repo.release_chunks([previous.get("content_file_id")])
         logger.info(f"Post updated: {post_id}")
-        return result.modified_count
+        _publish("update", obj_id)
+        # Matched count: find_one_and_update (needed for the previous chunk file
+        # id) does not report whether the document actually changed
+        return 1
     except NotFoundError:
+        _discard_chunks(file_id)
         raise
     except Exception as e:
+        _discard_chunks(file_id)
         logger.error(f"Error updating post: {e}")
         raise DatabaseException(str(e))
 
 def delete_post(post_id):
     try:
         obj_id = ObjectId(post_id)
-        result = collection.delete_one({"_id": obj_id})
-        if result.deleted_count == 0:
+        deleted = _collections["delete"].find_one_and_delete(
+            {"_id": obj_id}, projection={"content_file_id": 1}
+        )
+        if deleted is None:
             logger.warning(f"Post to delete not found: {post_id}")
             raise NotFoundError("Post not found")
+        _forget_reads([obj_id])
+        content_repo.release_chunks([deleted.get("content_file_id")])
         logger.info(f"Post deleted: {post_id}")
-        return result.deleted_count
+        _record_stats(stats_repo.record_deleted, [obj_id])
+        _publish("delete", obj_id)
+        return 1
     except NotFoundError:
         raise
     except Exception as e:
         logger.error(f"Error deleting post: {e}")
         raise DatabaseException(str(e))
+
+def get_post_content(post_id):
+    """
+    Return the body descriptor of a post: size in bytes, a version that changes
+    whenever the body does, plus either the inline content or the chunk file it
+    lives in. Use iter_post_content to read it.
+    """
+    try:
+        obj_id = ObjectId(post_id)
+        result = _collections["get"].find_one(
+            {"_id": obj_id},
+            {
+                "content": 1,
+                "content_size": 1,
+                "content_file_id": 1,
+                "content_chunk_size": 1,
+            },
+        )
+        if not result:
+            logger.warning(f"Post not found: {post_id}")
+            raise NotFoundError("Post not found")
+        if result.get("content_file_id") is not None:
+            # Every body gets a new chunk file, so its id identifies the body
+            return {
+                "size": result["content_size"],
+                "version": str(result["content_file_id"]),
+                "file_id": result["content_file_id"],
+                "chunk_size": result["content_chunk_size"],
+                "content": None,
+            }
+        content = str(result.get("content") or "").encode("utf-8")
+        return {
+            "size": len(content),
+            "version": hashlib.sha1(content).hexdigest(),
+            "file_id": None,
+            "chunk_size": None,
+            "content": content,
+        }
+    except NotFoundError:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching post content: {e}")
+        raise DatabaseException(str(e))
+
+def iter_post_content(content, start, stop):
+    """Yield the bytes in [start, stop) of a body returned by get_post_content."""
+    if content["file_id"] is None:
+        yield content["content"][start:stop]
+        return
+    try:
+        yield from content_repo.iter_chunks(
+            content["file_id"], content["chunk_size"], start, stop
+        )
+    except Exception as e:
+        logger.error(f"Error streaming post content: {e}")
+        raise DatabaseException(str(e))
+
+def bulk_update_posts(items):
+    """
+    Apply per-post updates as unordered bulk_write calls in bounded chunks.
+    items: list of (post_id, update_document).
+    """
+    col = _collections["bulk_update"]
+    report = {"matched": 0, "modified": 0, "chunks": 0, "errors": []}
+    try:
+        for chunk in _throttled_chunks(items):
+            requests = [UpdateOne({"_id": ObjectId(pid)}, upd) for pid, upd in chunk]
+            failed = set()
+            try:
+                result = col.bulk_write(requests, ordered=False)
+                matched = result.matched_count
+                report["modified"] += result.modified_count
+            except BulkWriteError as bwe:
+                details = bwe.details
+                matched = details.get("nMatched", 0)
+                report["modified"] += details.get("nModified", 0)
+                for err in details.get("writeErrors", []):
+                    failed.add(err["index"])
+                    report["errors"].append(
+                        {"id": chunk[err["index"]][0], "error": err.get("errmsg")}
+                    )
+            report["matched"] += matched
+            report["chunks"] += 1
+            obj_ids = [ObjectId(pid) for pid, _ in chunk]
+            _forget_reads(obj_ids)
+            applied = [obj_id for i, obj_id in enumerate(obj_ids) if i not in failed]
+            for obj_id in _matched_ids(col, applied, matched, {}):
+                _publish("update", obj_id)
+        logger.info(f"Bulk update: {report['modified']} posts modified")
+        return report
+    except Exception as e:
+        logger.error(f"Error in bulk update: {e}")
+        raise DatabaseException(str(e))
+
+def bulk_update_posts_by_filter(query, update, after=None):
+    """
+    Apply one update to posts matching query, chunk by chunk, at most
+    BULK_MAX_ITEMS per call; report["next"] resumes after the last post.
+    """
+    col = _collections["bulk_update"]
+    report = {"matched": 0, "modified": 0, "chunks": 0, "next": None}
+    try:
+        for docs in _sweep(col, query, {"_id": 1}, after, report):
+            ids = [doc["_id"] for doc in docs]
+            result = col.update_many({"$and": [query, {"_id": {"$in": ids}}]}, update)
+            report["matched"] += result.matched_count
+            report["modified"] += result.modified_count
+            report["chunks"] += 1
+            _forget_reads(ids)
+            applied = _applied_filter(update)
+            for obj_id in _matched_ids(col, ids, result.matched_count, applied):
+                _publish("update", obj_id)
+        logger.info(f"Bulk update by filter: {report['modified']} posts modified")
+        return report
+    except Exception as e:
+        logger.error(f"Error in bulk update by filter: {e}")
+        raise DatabaseException(str(e))
+
+def bulk_delete_posts(post_ids):
+    """Delete posts by id in chunks; report ids that were not found."""
+    obj_ids = [ObjectId(pid) for pid in post_ids]
+    report = bulk_delete_posts_by_filter({"_id": {"$in": obj_ids}})
+    seen = {str(obj_id) for obj_id in report.pop("ids")}
+    # At most BULK_MAX_ITEMS ids are accepted, so one sweep covers them all
+    report.pop("next")
+    report["not_found"] = [pid for pid in post_ids if str(ObjectId(pid)) not in seen]
+    return report
+
+def bulk_delete_posts_by_filter(query, after=None):
+    """
+    Delete posts matching query with delete_many, chunk by chunk, at most
+    BULK_MAX_ITEMS per call; report["next"] resumes after the last post.
+    """
+    col = _collections["bulk_delete"]
+    report = {"matched": 0, "deleted": 0, "chunks": 0, "next": None, "ids": []}
+    try:
+        projection = {"_id": 1, "content_file_id": 1}
+        for docs in _sweep(col, query, projection, after, report):
+            ids = [doc["_id"] for doc in docs]
+            result = col.delete_many({"$and": [query, {"_id": {"$in": ids}}]})
+            report["matched"] += len(ids)
+            report["deleted"] += result.deleted_count
+            report["chunks"] += 1
+            report["ids"].extend(ids)
+            _forget_reads(ids)
+            deleted = _deleted_docs(col, docs, result.deleted_count)
+            content_repo.release_chunks([doc.get("content_file_id") for doc in deleted])
+            for doc in deleted:
+                _publish("delete", doc["_id"])
+            _record_stats(stats_repo.record_deleted, [doc["_id"] for doc in deleted])
+        logger.info(f"Bulk delete: {report['deleted']} posts deleted")
+        return report
+    except Exception as e:
+        logger.error(f"Error in bulk delete: {e}")
+        raise DatabaseException(str(e))
+
+def watch_post_changes(ops=None, resume_token=None, max_await_ms=1000):
+    """
+    Open a change stream on posts, limited to the given change feed ops.
+    Return a generator of {"op", "id", "token"} events that yields None when
+    max_await_ms passed without changes, or None if the server has no change
+    streams (standalone server).
+    """
+    op_types = [t for op in (ops or _CHANGE_STREAM_OPS) for t in _CHANGE_STREAM_OPS[op]]
+    pipeline = [{"$match": {"operationType": {"$in": op_types}}}]
+    try:
+        stream = collection.watch(
+            pipeline, resume_after=resume_token, max_await_time_ms=max_await_ms
+        )
+    except OperationFailure as e:
+        if e.code in _CHANGE_STREAM_UNSUPPORTED_CODES:
+            return None
+        logger.error(f"Error opening post change stream: {e}")
+        raise DatabaseException(str(e))
+    except Exception as e:
+        logger.error(f"Error opening post change stream: {e}")
+        raise DatabaseException(str(e))
+    events = _iter_change_stream(stream)
+    # Enter the generator now so closing it always closes the stream
+    next(events)
+    return events
+
+def _iter_change_stream(stream):
+    ops = {t: op for op, types in _CHANGE_STREAM_OPS.items() for t in types}
+    try:
+        with stream:
+            yield
+            while stream.alive:
+                change = stream.try_next()
+                if change is None:
+                    yield None
+                    continue
+                yield {
+                    "op": ops[change["operationType"]],
+                    "id": str(change["documentKey"]["_id"]),
+                    "token": change["_id"],
+                }
+    except PyMongoError as e:
+        logger.error(f"Error reading post change stream: {e}")
+        raise DatabaseException(str(e))
+
+def _forget_reads(post_ids):
+    # Readers arriving after a write must not join a find_one started before it
+    for post_id in post_ids:
+        _post_reads.forget(str(post_id))
+
+def _publish(op, post_id):
+    # The change feed must never fail a write that already succeeded
+    try:
+        post_events.publish({"op": op, "id": str(post_id)})
+    except Exception as e:
+        logger.error(f"Failed to publish post {op} event for {post_id}: {e}")
+
+def _sweep(col, query, projection, after, report):
+    # Cap one call at BULK_MAX_ITEMS posts so it ends well within the worker
+    # timeout; set report["next"] to the last _id when more posts remain
+    limit = _config.BULK_MAX_ITEMS
+    last_id = ObjectId(after) if after else None
+    matching = _iter_matching(col, query, projection, last_id)
+    seen = 0
+    for docs in _throttled_chunks(itertools.islice(matching, limit)):
+        seen += len(docs)
+        last_id = docs[-1]["_id"]
+        yield docs
+    if seen == limit:
+        rest = {"$and": [query, {"_id": {"$gt": last_id}}]}
+        if col.find_one(rest, {"_id": 1}) is not None:
+            report["next"] = str(last_id)
+
+def _iter_matching(col, query, projection, last_id=None):
+    # Page by _id instead of holding one cursor open across throttled chunks
+    chunk_size = _bulk_chunk_size()
+    while True:
+        page_query = query
+        if last_id is not None:
+            page_query = {"$and": [query, {"_id": {"$gt": last_id}}]}
+        docs = list(
+            col.find(page_query, projection)
+            .sort("_id", 1)
+            .limit(chunk_size)
+        )
+        yield from docs
+        if len(docs) < chunk_size:
+            return
+        last_id = docs[-1]["_id"]
+
+def _bulk_chunk_size():
+    # At least 1: limit(0) means no limit and would never end a page
+    return max(_config.BULK_CHUNK_SIZE, 1)
+
+def _throttled_chunks(items):
+    # Group items into BULK_CHUNK_SIZE lists, sleeping BULK_THROTTLE_MS in between
+    chunk_size = _bulk_chunk_size()
+    chunk = []
+    first = True
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == chunk_size:
+            if not first:
+                time.sleep(_config.BULK_THROTTLE_MS / 1000)
+            yield chunk
+            chunk, first = [], False
+    if chunk:
+        if not first:
+            time.sleep(_config.BULK_THROTTLE_MS / 1000)
+        yield chunk
+
+def _deleted_docs(col, docs, deleted_count):
+    # delete_many re-checks the filter, so some matched posts may have survived
+    if deleted_count == len(docs):
+        return docs
+    ids = [doc["_id"] for doc in docs]
+    survivors = {doc["_id"] for doc in col.find({"_id": {"$in": ids}}, {"_id": 1})}
+    return [doc for doc in docs if doc["_id"] not in survivors]
+
+def _matched_ids(col, ids, matched_count, query):
+    # Missing posts and posts the re-checked filter dropped match nothing; find
+    # the ones the update reached (query describes them) so only they get events
+    if matched_count == len(ids):
+        return ids
+    query = {"$and": [query, {"_id": {"$in": ids}}]}
+    found = {doc["_id"] for doc in col.find(query, {"_id": 1})}
+    return [obj_id for obj_id in ids if obj_id in found]
+
+def _applied_filter(update):
+    # Posts a filter sweep updated now hold its $set values and lack its $unset
+    # fields; the sweep filter itself may no longer match them
+    applied = dict(update.get("$set", {}))
+    for field in update.get("$unset", {}):
+        applied[field] = {"$exists": False}
+    return applied
+
+def _record_stats(record, post_ids):
+    # Counters are best-effort here; the reconciliation job repairs any drift
+    try:
+        record(post_ids)
+    except Exception as e:
+        logger.error(f"Failed to update post stats: {e}")
+
+def _discard_chunks(file_id):
+    # Best-effort cleanup of chunks written for a post write that failed
+    try:
+        content_repo.delete_chunks(file_id)
+    except Exception as e:
+        logger.error(f"Failed to discard content chunks {file_id}: {e}")
@@ -0,0 +1,127 @@
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from bson import ObjectId
+from pymongo import ReplaceOne, UpdateOne
+from app.infrastructure.db.mongo_client import get_collection
+from app.utils.logger import get_logger
+from app.utils.exceptions.db_exceptions import DatabaseException
+
+logger = get_logger(__name__)
+# Materialized counters: {"_id": "total"} and {"_id": "day:YYYY-MM-DD", "day"}
+stats = get_collection("post_stats")
+posts = get_collection("posts")
+TOTAL_ID = "total"
+
+
+def record_created(post_ids):
+    _increment(post_ids, 1)
+
+
+def record_deleted(post_ids):
+    _increment(post_ids, -1)
+
+
+def get_stats(days):
+    """Return the total post count and the per-day counts of the last `days` days."""
+    try:
+        today = datetime.now(timezone.utc).date()
+        day_keys = [
+            (today - timedelta(days=i)).isoformat() for i in range(days - 1, -1, -1)
+        ]
+        ids = [TOTAL_ID] + [_day_id(day) for day in day_keys]
+        docs = stats.find({"_id": {"$in": ids}})
+        counts = {doc["_id"]: doc["count"] for doc in docs}
+        return {
+            "total": counts.get(TOTAL_ID, 0),
+            "daily": [
+                {"day": day, "count": counts.get(_day_id(day), 0)} for day in day_keys
+            ],
+        }
+    except Exception as e:
+        logger.error(f"Error fetching post stats: {e}")
+        raise DatabaseException(str(e))
+
+
+def rebuild():
+    """
+    Recompute every counter from the posts collection (reconciliation job).
+    Writes racing with the rebuild can still drift, so run it when quiet.
+    """
+    try:
+        daily = count_posts_by_day()
+        total = sum(daily.values())
+        daily.pop(None, None)
+        requests = [ReplaceOne({"_id": TOTAL_ID}, {"count": total}, upsert=True)]
+        requests += [
+            ReplaceOne(
+                {"_id": _day_id(day)}, {"day": day, "count": count}, upsert=True
+            )
+            for day, count in daily.items()
+        ]
+        stats.bulk_write(requests, ordered=False)
+        stale = stats.delete_many({"day": {"$exists": True, "$nin": list(daily)}})
+        logger.info(
+            f"Post stats rebuilt: total={total}, days={len(daily)}, "
+            f"stale removed={stale.deleted_count}"
+        )
+        return {"total": total, "days": len(daily)}
+    except Exception as e:
+        logger.error(f"Error rebuilding post stats: {e}")
+        raise DatabaseException(str(e))
+
+
+def count_posts_by_day():
+    """Count posts per UTC creation day (from the ObjectId); None for other ids."""
+    pipeline = [
+        {
+            "$group": {
+                "_id": {
+                    "$dateToString": {
+                        "format": "%Y-%m-%d",
+                        "date": {
+                            "$convert": {
+                                "input": "$_id",
+                                "to": "date",
+                                "onError": None,
+                                "onNull": None,
+                            }
+                        },
+                    }
+                },
+                "count": {"$sum": 1},
+            }
+        }
+    ]
+    return {doc["_id"]: doc["count"] for doc in posts.aggregate(pipeline)}
+
+
+def creation_day(post_id):
+    if isinstance(post_id, ObjectId):
+        return post_id.generation_time.date().isoformat()
+    return None
+
+
+def _increment(post_ids, delta):
+    if not post_ids:
+        return
+    per_day = Counter(creation_day(post_id) for post_id in post_ids)
+    per_day.pop(None, None)
+    requests = [
+        UpdateOne(
+            {"_id": TOTAL_ID}, {"$inc": {"count": delta * len(post_ids)}}, upsert=True
+        )
+    ]
+    requests += [
+        UpdateOne(
+            {"_id": _day_id(day)},
+            {"$inc": {"count": delta * n}, "$setOnInsert": {"day": day}},
+            upsert=True,
+        )
+        for day, n in per_day.items()
+    ]
+    stats.bulk_write(requests, ordered=False)
+
+
+def _day_id(day):
+    return f"day:{day}"
@@ -1,3 +1,30 @@
+from bson import ObjectId
+
+# Metadata of chunked content, only ever written by the repository
+CONTENT_METADATA_FIELDS = {
+    "content_preview",
+    "content_size",
+    "content_chunked",
+    "content_file_id",
+    "content_chunk_size",
+}
+# Fields that bulk mutations may never touch (identity and chunked content)
+PROTECTED_FIELDS = {"_id", "content"} | CONTENT_METADATA_FIELDS
+FILTER_OPERATORS = {
+    "$eq",
+    "$ne",
+    "$in",
+    "$nin",
+    "$gt",
+    "$gte",
+    "$lt",
+    "$lte",
+    "$exists",
+}
+CHANGE_FEED_OPS = ("create", "update", "delete")
+STATS_MAX_DAYS = 366
+
+
 def validate_post_input(data):
     """
     Validasi sederhana untuk post. Return (is_valid, errors).
@@ -9,4 +36,155 @@ def validate_post_input(data):
         errors["title"] = "Title is required"
     if not data.get("content"):
         errors["content"] = "Content is required"
+    for field in CONTENT_METADATA_FIELDS.intersection(data):
+        errors[field] = "Field cannot be set"
+    return (len(errors) == 0), errors
+
+
+def validate_change_feed_ops(ops):
+    """
+    Validasi filter operasi untuk change feed. Return (is_valid, errors).
+    """
+    invalid = [op for op in ops or () if op not in CHANGE_FEED_OPS]
+    if invalid:
+        allowed = ", ".join(CHANGE_FEED_OPS)
+        return False, {"ops": f"Unknown ops {invalid}, allowed: {allowed}"}
+    return True, {}
+
+
+def validate_stats_days(days):
+    """
+    Validasi jumlah hari untuk statistik post. Return (is_valid, errors).
+    """
+    if not isinstance(days, int) or not 1 <= days <= STATS_MAX_DAYS:
+        return False, {"days": f"days must be between 1 and {STATS_MAX_DAYS}"}
+    return True, {}
+
+
+def _is_field_name(name):
+    return (
+        isinstance(name, str)
+        and bool(name)
+        and all(part and not part.startswith("$") for part in name.split("."))
+    )
+
+
+def _root(field):
+    # Dotted paths ("content.x") touch their top-level field
+    return field.split(".")[0]
+
+
+def validate_bulk_filter(query):
+    """
+    Validasi filter untuk bulk mutation: field biasa dengan operator terbatas.
+    Return (is_valid, errors).
+    """
+    if not isinstance(query, dict) or not query:
+        return False, {"filter": "Filter must be a non-empty object"}
+    errors = {}
+    for field, cond in query.items():
+        if not _is_field_name(field) or _root(field) == "_id":
+            errors[str(field)] = "Field not allowed in filter"
+            continue
+        if not isinstance(cond, dict):
+            continue
+        if not cond:
+            errors[field] = "Condition must not be empty"
+        for op, value in cond.items():
+            if op not in FILTER_OPERATORS:
+                errors[field] = f"Operator {op} not allowed"
+            elif op in ("$in", "$nin") and not isinstance(value, list):
+                errors[field] = f"Operator {op} requires a list"
+    return (len(errors) == 0), errors
+
+
+def _validate_after(data, errors):
+    # Continuation cursor of a capped filter sweep: the last _id already handled
+    after = data.get("after")
+    if after is not None and not ObjectId.is_valid(after):
+        errors["after"] = "Invalid post id"
+
+
+def _validate_mutation(set_fields, unset_fields, errors, prefix=""):
+    if set_fields is None and unset_fields is None:
+        errors[f"{prefix}set"] = "At least one of set/unset is required"
+        return
+    if set_fields is not None:
+        if not isinstance(set_fields, dict) or not set_fields:
+            errors[f"{prefix}set"] = "set must be a non-empty object"
+        else:
+            for field in set_fields:
+                if not _is_field_name(field) or _root(field) in PROTECTED_FIELDS:
+                    errors[f"{prefix}set.{field}"] = "Field cannot be updated"
+            if "title" in set_fields and not set_fields["title"]:
+                errors[f"{prefix}set.title"] = "Title is required"
+    if unset_fields is not None:
+        if not isinstance(unset_fields, list) or not unset_fields:
+            errors[f"{prefix}unset"] = "unset must be a non-empty list"
+        else:
+            for field in unset_fields:
+                if (
+                    not _is_field_name(field)
+                    or _root(field) in PROTECTED_FIELDS
+                    or _root(field) == "title"
+                ):
+                    errors[f"{prefix}unset.{field}"] = "Field cannot be removed"
+
+
+def validate_bulk_update_input(data, max_items):
+    """
+    Validasi bulk update: {"items": [{"id", "set", "unset"}]} atau
+    {"filter", "set", "unset"}. Return (is_valid, errors).
+    """
+    if not isinstance(data, dict):
+        return False, {"input": "Invalid data type"}
+    errors = {}
+    if "items" in data:
+        items = data["items"]
+        if not isinstance(items, list) or not items:
+            return False, {"items": "items must be a non-empty list"}
+        if len(items) > max_items:
+            return False, {"items": f"At most {max_items} items are allowed"}
+        for i, item in enumerate(items):
+            if not isinstance(item, dict):
+                errors[f"items[{i}]"] = "Invalid data type"
+                continue
+            if not ObjectId.is_valid(item.get("id")):
+                errors[f"items[{i}].id"] = "Invalid post id"
+            _validate_mutation(
+                item.get("set"), item.get("unset"), errors, prefix=f"items[{i}]."
+            )
+    elif "filter" in data:
+        _, filter_errors = validate_bulk_filter(data["filter"])
+        errors.update(filter_errors)
+        _validate_after(data, errors)
+        _validate_mutation(data.get("set"), data.get("unset"), errors)
+    else:
+        errors["input"] = "Either items or filter is required"
+    return (len(errors) == 0), errors
+
+
+def validate_bulk_delete_input(data, max_items):
+    """
+    Validasi bulk delete: {"ids": [...]} atau {"filter": {...}}.
+    Return (is_valid, errors).
+    """
+    if not isinstance(data, dict):
+        return False, {"input": "Invalid data type"}
+    errors = {}
+    if "ids" in data:
+        ids = data["ids"]
+        if not isinstance(ids, list) or not ids:
+            return False, {"ids": "ids must be a non-empty list"}
+        if len(ids) > max_items:
+            return False, {"ids": f"At most {max_items} ids are allowed"}
+        for i, post_id in enumerate(ids):
+            if not ObjectId.is_valid(post_id):
+                errors[f"ids[{i}]"] = "Invalid post id"
+    elif "filter" in data:
+        _, filter_errors = validate_bulk_filter(data["filter"])
+        errors.update(filter_errors)
+        _validate_after(data, errors)
+    else:
+        errors["input"] = "Either ids or filter is required"
     return (len(errors) == 0), errors
@@ -1,6 +1,24 @@
+import time
+
 from app.core.repositories import post_repository as repo
-from app.core.schemas.post_schema import validate_post_input
+from app.core.repositories import post_stats_repository as stats_repo
+from app.core.schemas.post_schema import (
+    validate_bulk_delete_input,
+    validate_bulk_update_input,
+    validate_change_feed_ops,
+    validate_post_input,
+    validate_stats_days,
+)
+from app.infrastructure.config import get_config
+from app.utils.event_bus import SubscriptionOverflow
 from app.utils.exceptions.business_exceptions import ValidationError
+from app.utils.exceptions.db_exceptions import DatabaseException
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+_config = get_config()
+# Set to False once the server turns out to have no change streams ("auto" mode)
+_change_feed_state = {"change_streams": None}
 
 def create_post(data):
     is_valid, errors = validate_post_input(data)
@@ -19,3 +37,146 @@ def update_post(post_id, data):
 
 def delete_post(post_id):
     return repo.delete_post(post_id)
+
+def get_post_content(post_id):
+    return repo.get_post_content(post_id)
+
+def iter_post_content(content, start, stop):
+    return repo.iter_post_content(content, start, stop)
+
+def bulk_update_posts(data):
+    is_valid, errors = validate_bulk_update_input(data, _config.BULK_MAX_ITEMS)
+    if not is_valid:
+        raise ValidationError(str(errors))
+    if "items" in data:
+        items = [(item["id"], _build_update(item)) for item in data["items"]]
+        return repo.bulk_update_posts(items)
+    return repo.bulk_update_posts_by_filter(
+        data["filter"], _build_update(data), data.get("after")
+    )
+
+def bulk_delete_posts(data):
+    is_valid, errors = validate_bulk_delete_input(data, _config.BULK_MAX_ITEMS)
+    if not is_valid:
+        raise ValidationError(str(errors))
+    if "ids" in data:
+        return repo.bulk_delete_posts(data["ids"])
+    report = repo.bulk_delete_posts_by_filter(data["filter"], data.get("after"))
+    report.pop("ids")
+    return report
+
+def get_post_stats(days):
+    is_valid, errors = validate_stats_days(days)
+    if not is_valid:
+        raise ValidationError(str(errors))
+    return stats_repo.get_stats(days)
+
+def rebuild_post_stats():
+    return stats_repo.rebuild()
+
+def stream_post_changes(ops=None, resume_token=None):
+    """
+    Open the post change feed. Return a generator of {"op", "id", "token"}
+    events that yields None on idle heartbeats and ends after
+    CHANGE_FEED_MAX_STREAM_SECONDS. An op of "reset" means the resume token
+    could not be honoured and the consumer should resync.
+    """
+    is_valid, errors = validate_change_feed_ops(ops)
+    if not is_valid:
+        raise ValidationError(str(errors))
+    return _stream_changes(ops, resume_token)
+
+def _stream_changes(ops, resume_token):
+    # Open the source on first iteration: closing a generator that never started
+    # skips its finally, so a feed opened earlier would leak (e.g. on HEAD)
+    events = None
+    if _config.CHANGE_FEED_SOURCE != "event_bus":
+        events = _open_change_stream(ops, resume_token)
+    if events is None:
+        events = _open_event_bus(ops, resume_token)
+    deadline = time.monotonic() + _config.CHANGE_FEED_MAX_STREAM_SECONDS
+    try:
+        for event in events:
+            yield event
+            if time.monotonic() >= deadline:
+                return
+    finally:
+        events.close()
+
+def _open_change_stream(ops, resume_token):
+    auto = _config.CHANGE_FEED_SOURCE == "auto"
+    if auto and _change_feed_state["change_streams"] is False:
+        return None
+    max_await_ms = _config.CHANGE_FEED_HEARTBEAT_SECONDS * 1000
+    token = None
+    if resume_token and resume_token.startswith("cs."):
+        token = {"_data": resume_token[3:]}
+    reset = bool(resume_token) and token is None
+    try:
+        events = repo.watch_post_changes(ops, token, max_await_ms)
+    except DatabaseException:
+        if token is None:
+            raise
+        # Expired or invalid resume token: start from now and ask for a resync
+        logger.warning(f"Change feed resume token rejected: {resume_token}")
+        events = repo.watch_post_changes(ops, None, max_await_ms)
+        reset = True
+    if events is None:
+        if not auto:
+            raise DatabaseException("Change streams are not supported by MongoDB")
+        logger.info("Change streams unavailable, using in-process post events")
+        _change_feed_state["change_streams"] = False
+        return None
+    return _iter_change_stream(events, reset)
+
+def _iter_change_stream(events, reset):
+    try:
+        if reset:
+            yield {"op": "reset", "id": None, "token": None}
+        for event in events:
+            if event is not None:
+                event = dict(event, token="cs." + event["token"]["_data"])
+            yield event
+    finally:
+        events.close()
+
+def _open_event_bus(ops, resume_token):
+    bus = repo.post_events
+    after = None
+    prefix = f"bus.{bus.id}."
+    if resume_token and resume_token.startswith(prefix):
+        seq = resume_token[len(prefix):]
+        after = int(seq) if seq.isdigit() else None
+    subscription, resumed = bus.subscribe(
+        ops, after=after, buffer_size=_config.CHANGE_FEED_BUFFER_SIZE
+    )
+    reset = bool(resume_token) and (after is None or not resumed)
+    return _iter_subscription(subscription, prefix, reset)
+
+def _iter_subscription(subscription, prefix, reset):
+    try:
+        if reset:
+            yield {"op": "reset", "id": None, "token": None}
+        while True:
+            try:
+                event = subscription.get(_config.CHANGE_FEED_HEARTBEAT_SECONDS)
+            except SubscriptionOverflow as e:
+                # Dropped for falling behind; events were lost, so ask for a resync
+                logger.warning(f"Change feed: {e}")
+                yield {"op": "reset", "id": None, "token": None}
+                return
+            if event is None:
+                yield None
+                continue
+            token = f"{prefix}{event['seq']}"
+            yield {"op": event["op"], "id": event["id"], "token": token}
+    finally:
+        subscription.close()
+
+def _build_update(spec):
+    update = {}
+    if spec.get("set"):
+        update["$set"] = spec["set"]
+    if spec.get("unset"):
+        update["$unset"] = {field: "" for field in spec["unset"]}
+    return update
@@ -22,6 +22,60 @@ class Config:
     TESTING = False
     GUNICORN_WORKERS = int(os.getenv("GUNICORN_WORKERS", 4))
 
+    # Read preference per read operation (primary, primaryPreferred, secondary,
+    # secondaryPreferred, nearest). Max staleness applies to non-primary reads,
+    # -1 means no bound (MongoDB requires >= 90 seconds otherwise).
+    MONGO_READ_PREFERENCE = os.getenv("MONGO_READ_PREFERENCE", "primary")
+    MONGO_MAX_STALENESS_SECONDS = int(os.getenv("MONGO_MAX_STALENESS_SECONDS", -1))
+    MONGO_READ_PREFERENCES = {
+        "get": os.getenv("MONGO_READ_PREFERENCE_GET", MONGO_READ_PREFERENCE),
+    }
+
+    # Write concern per write operation ("1" or "majority", empty = client default)
+    MONGO_WRITE_CONCERN = os.getenv("MONGO_WRITE_CONCERN", "")
+    MONGO_WRITE_CONCERNS = {
+        "create": os.getenv("MONGO_WRITE_CONCERN_CREATE", MONGO_WRITE_CONCERN),
+        "update": os.getenv("MONGO_WRITE_CONCERN_UPDATE", MONGO_WRITE_CONCERN),
+        "delete": os.getenv("MONGO_WRITE_CONCERN_DELETE", MONGO_WRITE_CONCERN),
+        "bulk_update": os.getenv(
+            "MONGO_WRITE_CONCERN_BULK_UPDATE", MONGO_WRITE_CONCERN
+        ),
+        "bulk_delete": os.getenv(
+            "MONGO_WRITE_CONCERN_BULK_DELETE", MONGO_WRITE_CONCERN
+        ),
+    }
+
+    # Post content larger than the threshold (bytes, UTF-8) is stored out of line
+    # in chunks; the post document keeps only metadata and a preview.
+    POST_CONTENT_CHUNK_THRESHOLD = int(
+        os.getenv("POST_CONTENT_CHUNK_THRESHOLD", 512 * 1024)
+    )
+    POST_CONTENT_CHUNK_SIZE = int(os.getenv("POST_CONTENT_CHUNK_SIZE", 255 * 1024))
+    POST_CONTENT_PREVIEW_CHARS = int(os.getenv("POST_CONTENT_PREVIEW_CHARS", 500))
+    # Superseded chunks stay readable this long for in-flight streams, then a
+    # TTL index removes them (a changed value is applied with collMod on boot)
+    POST_CONTENT_CHUNK_GRACE_SECONDS = int(
+        os.getenv("POST_CONTENT_CHUNK_GRACE_SECONDS", 3600)
+    )
+
+    # Bulk mutations run in chunks of BULK_CHUNK_SIZE posts, sleeping
+    # BULK_THROTTLE_MS between chunks so sweeps don't starve live traffic.
+    BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", 500))
+    BULK_THROTTLE_MS = int(os.getenv("BULK_THROTTLE_MS", 0))
+    BULK_MAX_ITEMS = int(os.getenv("BULK_MAX_ITEMS", 10000))
+
+    # Post change feed (SSE). Source is "auto" (change streams when the server
+    # supports them, else the in-process event bus), "change_stream" or
+    # "event_bus". Streams close after CHANGE_FEED_MAX_STREAM_SECONDS and
+    # clients reconnect with Last-Event-ID.
+    CHANGE_FEED_SOURCE = os.getenv("CHANGE_FEED_SOURCE", "auto").lower()
+    CHANGE_FEED_BUFFER_SIZE = int(os.getenv("CHANGE_FEED_BUFFER_SIZE", 1000))
+    CHANGE_FEED_HISTORY_SIZE = int(os.getenv("CHANGE_FEED_HISTORY_SIZE", 10000))
+    CHANGE_FEED_HEARTBEAT_SECONDS = int(os.getenv("CHANGE_FEED_HEARTBEAT_SECONDS", 15))
+    CHANGE_FEED_MAX_STREAM_SECONDS = int(
+        os.getenv("CHANGE_FEED_MAX_STREAM_SECONDS", 300)
+    )
+
 
 class DevelopmentConfig(Config):
     FLASK_ENV = "development"
@@ -1,6 +1,14 @@
 import os
 
 from pymongo import MongoClient, errors
+from pymongo.read_preferences import (
+    Nearest,
+    Primary,
+    PrimaryPreferred,
+    Secondary,
+    SecondaryPreferred,
+)
+from pymongo.write_concern import WriteConcern
 
 from app.infrastructure.config import get_config
 from app.utils.exceptions.db_exceptions import DatabaseException
@@ -9,6 +17,14 @@ from app.utils.logger import get_logger
 logger = get_logger(__name__)
 _config = get_config()
 
+# Non-primary read preference modes, keyed by lowercase mode name
+_READ_PREFERENCES = {
+    "primarypreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondarypreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
 
 class MongoDB:
     """
@@ -55,9 +71,25 @@ class MongoDB:
             self.connect()
         return self.db
 
-    def get_collection(self, name):
+    def get_collection(self, name, read_preference=None, write_concern=None):
         db = self.get_db()
-        return db[name]
+        if read_preference is None and write_concern is None:
+            return db[name]
+        return db.get_collection(
+            name, read_preference=read_preference, write_concern=write_concern
+        )
+
+    def get_collection_for(self, name, operation, config=None):
+        """Get a collection using the read/write policy configured for an operation."""
+        config = config or _config
+        read_mode = getattr(config, "MONGO_READ_PREFERENCES", {}).get(operation)
+        w = getattr(config, "MONGO_WRITE_CONCERNS", {}).get(operation)
+        max_staleness = getattr(config, "MONGO_MAX_STALENESS_SECONDS", -1)
+        return self.get_collection(
+            name,
+            read_preference=build_read_preference(read_mode, max_staleness),
+            write_concern=build_write_concern(w),
+        )
 
     @staticmethod
     def _extract_db_name(uri):
@@ -75,6 +107,42 @@ class MongoDB:
         return getattr(_config, "DB_NAME", os.getenv("DB_NAME", "your_db"))
 
 
+def build_read_preference(mode, max_staleness=-1):
+    """
+    Build a pymongo read preference from a mode name (e.g. "nearest").
+    Return None when mode is empty so the client default is used.
+    """
+    if not mode:
+        return None
+    key = mode.strip().lower()
+    # Primary reads cannot carry a staleness bound
+    if key == "primary":
+        return Primary()
+    if key not in _READ_PREFERENCES:
+        raise ValueError(f"Unknown MongoDB read preference: {mode}")
+    # pymongo accepts smaller bounds here but fails every server selection later
+    if max_staleness != -1 and max_staleness < 90:
+        raise ValueError(
+            f"MongoDB max staleness must be -1 or at least 90 seconds: {max_staleness}"
+        )
+    return _READ_PREFERENCES[key](max_staleness=max_staleness)
+
+
+def build_write_concern(w):
+    """
+    Build a pymongo write concern from "1" or "majority".
+    Return None when w is empty so the client default is used.
+    """
+    if w in (None, ""):
+        return None
+    w = str(w).strip()
+    if w == "majority":
+        return WriteConcern(w="majority")
+    if w.isdigit():
+        return WriteConcern(w=int(w))
+    raise ValueError(f"Unknown MongoDB write concern: {w}")
+
+
 # Singleton instance for main app usage
 mongo = MongoDB()
 
@@ -84,6 +152,13 @@ def get_db():
     return mongo.get_db()
 
 
-def get_collection(name):
+def get_collection(name, read_preference=None, write_concern=None):
     """Get a collection with a specific name from main db (singleton)."""
-    return mongo.get_collection(name)
+    return mongo.get_collection(
+        name, read_preference=read_preference, write_concern=write_concern
+    )
+
+
+def get_collection_for(name, operation):
+    """Get a collection from main db with the policy of an operation (singleton)."""
+    return mongo.get_collection_for(name, operation)
@@ -0,0 +1,134 @@
+import threading
+import uuid
+from collections import deque
+
+# Registry of all EventBus instances so their counters can be reported together
+_buses = {}
+_buses_lock = threading.Lock()
+
+
+class SubscriptionOverflow(Exception):
+    """Subscriber fell more than its buffer size behind and was dropped."""
+
+
+class Subscription:
+    """
+    Bounded queue of events for one subscriber.
+
+    When the buffer is full the subscription is dropped instead of growing, so
+    a slow consumer never holds more than buffer_size events in memory.
+    """
+
+    def __init__(self, bus, ops, buffer_size):
+        self._bus = bus
+        self.ops = set(ops or ())
+        self.buffer_size = buffer_size
+        self.overflowed = False
+        self._queue = deque()
+        self._cond = threading.Condition()
+
+    def _push(self, event):
+        if self.ops and event["op"] not in self.ops:
+            return
+        with self._cond:
+            if len(self._queue) >= self.buffer_size:
+                self.overflowed = True
+                self._queue.clear()
+            else:
+                self._queue.append(event)
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Return the next event, or None if none arrived within timeout."""
+        with self._cond:
+            if not self._queue and not self.overflowed:
+                self._cond.wait(timeout)
+            if self.overflowed:
+                raise SubscriptionOverflow(
+                    f"Subscriber of '{self._bus.name}' overflowed"
+                )
+            return self._queue.popleft() if self._queue else None
+
+    def close(self):
+        self._bus._unsubscribe(self)
+
+
+class EventBus:
+    """
+    In-process publish/subscribe with a bounded history for resuming.
+
+    Every event gets an increasing seq; a subscriber can resume after a seq as
+    long as it is still in the history. The bus is per process, so subscribers
+    only see events published by the same worker.
+    """
+
+    def __init__(self, name, history_size=10000):
+        self.name = name
+        self.id = uuid.uuid4().hex[:12]
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._history = deque(maxlen=history_size)
+        self._subscribers = set()
+        self._stats = {"published": 0, "overflowed": 0}
+        with _buses_lock:
+            _buses[name] = self
+
+    def publish(self, event):
+        with self._lock:
+            self._seq += 1
+            event = dict(event, seq=self._seq)
+            self._history.append(event)
+            self._stats["published"] += 1
+            for sub in list(self._subscribers):
+                sub._push(event)
+                if sub.overflowed:
+                    self._subscribers.discard(sub)
+                    self._stats["overflowed"] += 1
+        return event
+
+    def subscribe(self, ops=None, after=None, buffer_size=1000):
+        """
+        Subscribe to events, optionally replaying the ones after seq `after`.
+        Return (subscription, resumed); resumed is False when `after` is no
+        longer in the history, or its replay would not fit in buffer_size, and
+        the subscription starts from now instead.
+        """
+        with self._lock:
+            sub = Subscription(self, ops, buffer_size)
+            resumed = after is None or self._can_resume(after)
+            if after is not None and resumed:
+                backlog = [
+                    event
+                    for event in self._history
+                    if event["seq"] > after and (not sub.ops or event["op"] in sub.ops)
+                ]
+                # Replaying more than fits would overflow on every reconnect
+                if len(backlog) > buffer_size:
+                    resumed = False
+                else:
+                    for event in backlog:
+                        sub._push(event)
+            self._subscribers.add(sub)
+        return sub, resumed
+
+    def _can_resume(self, after):
+        oldest = self._history[0]["seq"] if self._history else self._seq + 1
+        return oldest - 1 <= after <= self._seq
+
+    def _unsubscribe(self, sub):
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["seq"] = self._seq
+            stats["subscribers"] = len(self._subscribers)
+        return stats
+
+
+def get_stats():
+    """Return counters for every registered EventBus, keyed by name."""
+    with _buses_lock:
+        buses = list(_buses.values())
+    return {bus.name: bus.stats() for bus in buses}
@@ -0,0 +1,98 @@
+import threading
+
+# Registry of all SingleFlight groups so their counters can be reported together
+_groups = {}
+_groups_lock = threading.Lock()
+
+
+class _Call:
+    """One in-flight call that followers wait on."""
+
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls for the same key into one execution.
+
+    The first caller for a key (the leader) runs the function; callers arriving
+    while it is still running wait and receive the same result or exception.
+    Built on threading primitives, so it works with gthread workers and with
+    gevent/eventlet workers (which monkey-patch threading to be cooperative).
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._stats = {
+            "calls": 0,
+            "executions": 0,
+            "coalesced": 0,
+            "errors": 0,
+            "forgotten": 0,
+        }
+        with _groups_lock:
+            _groups[name] = self
+
+    def do(self, key, fn):
+        with self._lock:
+            self._stats["calls"] += 1
+            call = self._calls.get(key)
+            if call is not None:
+                self._stats["coalesced"] += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self._stats["executions"] += 1
+                leader = True
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            with self._lock:
+                self._stats["errors"] += 1
+            raise
+        finally:
+            # Remove before waking followers so later callers start a fresh call
+            with self._lock:
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+            call.event.set()
+
+    def forget(self, key):
+        """
+        Detach the in-flight call for key, if any, so later callers start a fresh
+        call. Callers already waiting still receive its result. Use after a write
+        so readers arriving afterwards never get a value read before it.
+        """
+        with self._lock:
+            if self._calls.pop(key, None) is not None:
+                self._stats["forgotten"] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = len(self._calls)
+        return stats
+
+
+def get_stats():
+    """Return counters for every registered SingleFlight group, keyed by name."""
+    with _groups_lock:
+        groups = list(_groups.values())
+    return {group.name: group.stats() for group in groups}
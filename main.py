@@ -1,4 +1,5 @@
 import os
+import click
 from flask import Flask, jsonify, request
 from werkzeug.exceptions import HTTPException
 
@@ -49,6 +50,17 @@ def create_app():
             500,
         )
 
+    @app.cli.command("rebuild-post-stats")
+    def rebuild_post_stats():
+        """Rebuild the post statistics counters from the posts collection."""
+        from app.core.services import post_service
+
+        result = post_service.rebuild_post_stats()
+        logger.info(f"Post stats rebuilt: {result}")
+        click.echo(
+            f"Post stats rebuilt: total={result['total']}, days={result['days']}"
+        )
+
     return app
 
 
@@ -0,0 +1,65 @@
+"""
+One-off migration: move inline post content above POST_CONTENT_CHUNK_THRESHOLD
+into chunks, for posts written before chunked content existed.
+
+Run with: python -m migrations.split_large_post_content
+Safe to re-run; posts written concurrently are skipped and picked up next run.
+"""
+
+from app.core.repositories import post_content_repository as content_repo
+from app.infrastructure.config import get_config
+from app.infrastructure.db.mongo_client import get_collection
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Fields split_content adds to a post document besides the chunk file fields
+_SPLIT_FIELDS = ("content_preview", "content_size", "content_chunked")
+
+
+def find_large_posts(posts, threshold):
+    """Yield the ids of posts whose inline content is larger than threshold."""
+    query = {
+        "content": {"$type": "string"},
+        "$expr": {"$gt": [{"$strLenBytes": "$content"}, threshold]},
+    }
+    for post in posts.find(query, {"_id": 1}):
+        yield post["_id"]
+
+
+def split_post(posts, post_id, config):
+    """Split one post's content into chunks. Return True if the post was updated."""
+    post = posts.find_one({"_id": post_id}, {"content": 1})
+    if post is None:
+        return False
+    doc, body = content_repo.split_content(post, config)
+    if body is None:
+        return False
+    fields = {field: doc[field] for field in _SPLIT_FIELDS}
+    fields.update(content_repo.save_chunks(body, config))
+    # Only swap if the content is still the one that was split
+    result = posts.update_one(
+        {"_id": post_id, "content": post["content"]},
+        {"$set": fields, "$unset": {"content": ""}},
+    )
+    if result.matched_count == 0:
+        content_repo.delete_chunks(fields["content_file_id"])
+        logger.warning(f"Post changed during migration, skipped: {post_id}")
+        return False
+    return True
+
+
+def run(config=None):
+    config = config or get_config()
+    posts = get_collection("posts")
+    report = {"scanned": 0, "split": 0}
+    for post_id in find_large_posts(posts, config.POST_CONTENT_CHUNK_THRESHOLD):
+        report["scanned"] += 1
+        if split_post(posts, post_id, config):
+            report["split"] += 1
+    logger.info(f"Split large post content: {report}")
+    return report
+
+
+if __name__ == "__main__":
+    print(run())
@@ -0,0 +1,640 @@
+import importlib
+import threading
+import time
+from datetime import datetime, timezone
+
+import mongomock
+import pytest
+from flask import Flask
+from pymongo.errors import OperationFailure
+
+from app.infrastructure.db import mongo_client
+from app.infrastructure.db.mongo_client import MongoDB
+
+
+@pytest.fixture
+def repo(monkeypatch):
+    # Pakai mongomock untuk singleton, lalu reload repository agar collection baru
+    mongo = MongoDB(
+        uri="mongodb://localhost:27017/test_db",
+        client_class=mongomock.MongoClient,
+    )
+    monkeypatch.setattr(mongo_client, "mongo", mongo)
+    from app.core.repositories import (
+        post_content_repository,
+        post_repository,
+        post_stats_repository,
+    )
+
+    importlib.reload(post_content_repository)
+    importlib.reload(post_stats_repository)
+    importlib.reload(post_repository)
+    config = post_content_repository._config
+    monkeypatch.setattr(config, "POST_CONTENT_CHUNK_THRESHOLD", 16)
+    monkeypatch.setattr(config, "POST_CONTENT_CHUNK_SIZE", 8)
+    monkeypatch.setattr(config, "POST_CONTENT_PREVIEW_CHARS", 4)
+    monkeypatch.setattr(config, "BULK_CHUNK_SIZE", 2)
+    monkeypatch.setattr(config, "BULK_MAX_ITEMS", 10)
+    monkeypatch.setattr(config, "CHANGE_FEED_HEARTBEAT_SECONDS", 0.05)
+    monkeypatch.setattr(config, "CHANGE_FEED_MAX_STREAM_SECONDS", 0.2)
+    monkeypatch.setattr(config, "CHANGE_FEED_SOURCE", "event_bus")
+    yield post_repository
+
+
+@pytest.fixture
+def client(repo):
+    from app.api.v1.post_controller import bp
+
+    app = Flask(__name__)
+    app.register_blueprint(bp, url_prefix="/posts")
+    return app.test_client()
+
+
+def test_operations_use_configured_policy(repo, monkeypatch):
+    config = repo._config
+    monkeypatch.setattr(config, "MONGO_READ_PREFERENCES", {"get": "nearest"})
+    monkeypatch.setattr(config, "MONGO_MAX_STALENESS_SECONDS", 120)
+    monkeypatch.setattr(
+        config, "MONGO_WRITE_CONCERNS", {"create": "2", "bulk_delete": "majority"}
+    )
+    importlib.reload(repo)
+    collections = repo._collections
+    assert collections["get"].read_preference.name == "Nearest"
+    assert collections["get"].read_preference.max_staleness == 120
+    # w=2 since mongomock treats w=1 as its default and drops it
+    assert collections["create"].write_concern.document == {"w": 2}
+    assert collections["bulk_delete"].write_concern.document == {"w": "majority"}
+    assert collections["update"].read_preference.name == "Primary"
+    assert collections["update"].write_concern.document == {}
+
+
+class _BlockingFindOne:
+    """Collection wrapper whose find_one waits until released."""
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.calls = 0
+        self.release = threading.Event()
+
+    def find_one(self, *args, **kwargs):
+        result = self.collection.find_one(*args, **kwargs)
+        self.calls += 1
+        self.release.wait(timeout=5)
+        return result
+
+
+def _wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() >= deadline:
+            raise AssertionError("Timed out waiting for condition")
+        time.sleep(0.001)
+
+
+def _get_in_threads(repo, post_id, n):
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(repo.get_post(post_id)))
+        for _ in range(n)
+    ]
+    for t in threads:
+        t.start()
+    return threads, results
+
+
+def test_get_post_coalesces_concurrent_reads(repo, monkeypatch):
+    post_id = repo.create_post({"title": "viral", "content": "c"})
+    blocking = _BlockingFindOne(repo._collections["get"])
+    monkeypatch.setitem(repo._collections, "get", blocking)
+
+    threads, results = _get_in_threads(repo, post_id, 8)
+    _wait_for(lambda: repo._post_reads.stats()["calls"] == 8)
+    blocking.release.set()
+    for t in threads:
+        t.join()
+
+    assert blocking.calls == 1
+    assert [r["title"] for r in results] == ["viral"] * 8
+    # Every caller gets its own copy of the document
+    assert len({id(r) for r in results}) == 8
+
+
+def test_get_post_after_update_does_not_join_stale_read(repo, monkeypatch):
+    post_id = repo.create_post({"title": "old", "content": "c"})
+    blocking = _BlockingFindOne(repo._collections["get"])
+    monkeypatch.setitem(repo._collections, "get", blocking)
+
+    threads, results = _get_in_threads(repo, post_id, 1)
+    _wait_for(lambda: blocking.calls == 1)
+    repo.update_post(post_id, {"title": "new", "content": "c"})
+    blocking.release.set()
+
+    assert repo.get_post(post_id)["title"] == "new"
+    for t in threads:
+        t.join()
+    assert results[0]["title"] == "old"
+    assert blocking.calls == 2
+
+
+def _read_all(repo, post_id):
+    content = repo.get_post_content(post_id)
+    return b"".join(repo.iter_post_content(content, 0, content["size"]))
+
+
+def test_small_content_stays_inline(repo):
+    post_id = repo.create_post({"title": "t", "content": "short"})
+    post = repo.get_post(post_id)
+    assert post["content"] == "short"
+    assert "content_chunked" not in post
+    assert _read_all(repo, post_id) == b"short"
+
+
+def test_large_content_is_chunked(repo):
+    body = "abcdefghij" * 5
+    post_id = repo.create_post({"title": "t", "content": body})
+    post = repo.get_post(post_id)
+    assert "content" not in post
+    assert "content_file_id" not in post
+    assert post["content_preview"] == "abcd"
+    assert post["content_size"] == 50
+    assert post["content_chunked"] is True
+    assert repo.content_repo.chunks.count_documents({}) == 7
+    assert _read_all(repo, post_id) == body.encode()
+
+    content = repo.get_post_content(post_id)
+    assert b"".join(repo.iter_post_content(content, 5, 21)) == body.encode()[5:21]
+
+
+@pytest.mark.parametrize(
+    "field, value",
+    [
+        ("content_file_id", "abc"),
+        ("content_chunk_size", 8),
+        ("content_size", 999),
+        ("content_chunked", True),
+        ("content_preview", "p"),
+    ],
+)
+def test_single_writes_reject_content_metadata(client, repo, field, value):
+    body = {"title": "t", "content": "c", field: value}
+    assert client.post("/posts/", json=body).status_code == 422
+    post_id = repo.create_post({"title": "t", "content": "c"})
+    assert client.put(f"/posts/{post_id}", json=body).status_code == 422
+    assert field not in repo.get_post(post_id)
+
+
+def _live_chunks(repo):
+    live = {"superseded_at": {"$exists": False}}
+    return repo.content_repo.chunks.count_documents(live)
+
+
+def test_update_and_delete_release_chunks(repo):
+    post_id = repo.create_post({"title": "t", "content": "x" * 40})
+    repo.update_post(post_id, {"title": "t", "content": "y" * 20})
+    # Old chunks are only marked for the TTL index, not deleted yet
+    assert repo.content_repo.chunks.count_documents({}) == 8
+    assert _live_chunks(repo) == 3
+    assert _read_all(repo, post_id) == b"y" * 20
+
+    repo.update_post(post_id, {"title": "t", "content": "small"})
+    post = repo.get_post(post_id)
+    assert post["content"] == "small"
+    assert "content_preview" not in post
+    assert _live_chunks(repo) == 0
+
+    repo.update_post(post_id, {"title": "t", "content": "z" * 30})
+    repo.delete_post(post_id)
+    assert _live_chunks(repo) == 0
+
+
+def test_changed_grace_period_updates_ttl_index(repo, monkeypatch):
+    content_repo = repo.content_repo
+    commands = []
+    monkeypatch.setattr(
+        mongomock.database.Database, "command", lambda self, cmd: commands.append(cmd)
+    )
+    monkeypatch.setattr(content_repo._config, "POST_CONTENT_CHUNK_GRACE_SECONDS", 60)
+    importlib.reload(content_repo)
+    assert commands == [
+        {
+            "collMod": "post_chunks",
+            "index": {"keyPattern": {"superseded_at": 1}, "expireAfterSeconds": 60},
+        }
+    ]
+
+    # Still starts when the TTL cannot be changed
+    def reject(self, cmd):
+        raise OperationFailure("not authorized")
+
+    monkeypatch.setattr(mongomock.database.Database, "command", reject)
+    monkeypatch.setattr(content_repo._config, "POST_CONTENT_CHUNK_GRACE_SECONDS", 30)
+    importlib.reload(content_repo)
+
+
+def test_stream_survives_update_and_fails_on_missing_chunks(repo):
+    post_id = repo.create_post({"title": "t", "content": "x" * 40})
+    content = repo.get_post_content(post_id)
+    stream = repo.iter_post_content(content, 0, content["size"])
+    first = next(stream)
+
+    # A reader already streaming the old body still gets all of it
+    repo.update_post(post_id, {"title": "t", "content": "y" * 40})
+    assert first + b"".join(stream) == b"x" * 40
+
+    # Chunks vanishing mid-stream raise instead of truncating the body
+    repo.content_repo.chunks.delete_many({"files_id": content["file_id"], "n": 3})
+    stream = repo.iter_post_content(content, 0, content["size"])
+    with pytest.raises(repo.DatabaseException):
+        b"".join(stream)
+
+
+def test_migration_splits_legacy_inline_content(repo):
+    from migrations import split_large_post_content as migration
+
+    config = repo._config
+    legacy = repo.collection.insert_one({"title": "t", "content": "x" * 40})
+    post_id = legacy.inserted_id
+    assert migration.split_post(repo.collection, post_id, config) is True
+    post = repo.get_post(str(post_id))
+    assert "content" not in post
+    assert post["content_size"] == 40
+    assert _read_all(repo, str(post_id)) == b"x" * 40
+
+    # Already split, or small content: nothing to do
+    assert migration.split_post(repo.collection, post_id, config) is False
+    small = repo.collection.insert_one({"title": "t", "content": "short"})
+    assert migration.split_post(repo.collection, small.inserted_id, config) is False
+
+
+def test_content_endpoint_range(client, repo):
+    body = "0123456789" * 4
+    post_id = repo.create_post({"title": "t", "content": body})
+
+    full = client.get(f"/posts/{post_id}/content")
+    assert full.status_code == 200
+    assert full.headers["Accept-Ranges"] == "bytes"
+    assert full.data == body.encode()
+
+    partial = client.get(f"/posts/{post_id}/content", headers={"Range": "bytes=6-17"})
+    assert partial.status_code == 206
+    assert partial.headers["Content-Range"] == "bytes 6-17/40"
+    assert partial.data == body.encode()[6:18]
+
+    suffix = client.get(f"/posts/{post_id}/content", headers={"Range": "bytes=-5"})
+    assert suffix.data == body.encode()[-5:]
+
+    invalid = client.get(f"/posts/{post_id}/content", headers={"Range": "bytes=50-"})
+    assert invalid.status_code == 416
+    assert invalid.headers["Content-Range"] == "bytes */40"
+
+
+# Inline and chunked bodies
+@pytest.mark.parametrize("content", ["0123456789ab", "abcdefghij" * 5])
+def test_content_endpoint_if_range(client, repo, content):
+    post_id = repo.create_post({"title": "t", "content": content})
+    etag = client.get(f"/posts/{post_id}/content").headers["ETag"]
+    resume = {"Range": "bytes=10-", "If-Range": etag}
+
+    partial = client.get(f"/posts/{post_id}/content", headers=resume)
+    assert partial.status_code == 206
+    assert partial.data == content.encode()[10:]
+
+    # The body changed: resuming would splice two bodies, so send it whole
+    repo.update_post(post_id, {"title": "t", "content": content.upper() + "!"})
+    full = client.get(f"/posts/{post_id}/content", headers=resume)
+    assert full.status_code == 200
+    assert full.headers["ETag"] != etag
+    assert "Content-Range" not in full.headers
+    assert full.data == (content.upper() + "!").encode()
+
+    dated = {"Range": "bytes=10-", "If-Range": "Wed, 21 Oct 2015 07:28:00 GMT"}
+    assert client.get(f"/posts/{post_id}/content", headers=dated).status_code == 200
+
+
+def _published_ids(subscription):
+    events = []
+    while (event := subscription.get(timeout=0)) is not None:
+        events.append((event["op"], event["id"]))
+    subscription.close()
+    return events
+
+
+def test_bulk_update_by_ids(client, repo):
+    ids = [repo.create_post({"title": f"t{i}", "content": "c"}) for i in range(3)]
+    missing = "64b000000000000000000000"
+    subscription, _ = repo.post_events.subscribe()
+    items = [{"id": pid, "set": {"status": "hidden"}} for pid in ids + [missing]]
+    resp = client.post("/posts/bulk/update", json={"items": items})
+    assert resp.status_code == 200
+    report = resp.get_json()["data"]
+    assert report["matched"] == 3
+    assert report["modified"] == 3
+    assert report["chunks"] == 2
+    assert repo.get_post(ids[0])["status"] == "hidden"
+    # Ids that matched nothing get no change event
+    assert _published_ids(subscription) == [("update", pid) for pid in ids]
+
+
+def test_bulk_update_by_filter_publishes_only_matched(repo, monkeypatch):
+    ids = [repo.create_post({"title": "t", "content": "c", "tag": "spam"})]
+    ids.append(repo.create_post({"title": "t", "content": "c", "tag": "spam"}))
+    iter_matching = repo._iter_matching
+
+    def racing(*args, **kwargs):
+        docs = list(iter_matching(*args, **kwargs))
+        # The first post leaves the filter between the sweep's find and update
+        repo.collection.update_one({"_id": docs[0]["_id"]}, {"$set": {"tag": "ok"}})
+        yield from docs
+
+    monkeypatch.setattr(repo, "_iter_matching", racing)
+    subscription, _ = repo.post_events.subscribe()
+    report = repo.bulk_update_posts_by_filter({"tag": "spam"}, {"$set": {"tag": "x"}})
+    assert report["matched"] == 1
+    assert _published_ids(subscription) == [("update", ids[1])]
+
+
+def test_bulk_update_by_filter(client, repo):
+    for i in range(5):
+        repo.create_post({"title": f"t{i}", "content": "c", "tag": "spam"})
+    repo.create_post({"title": "keep", "content": "c", "tag": "ok"})
+    resp = client.post(
+        "/posts/bulk/update",
+        json={"filter": {"tag": "spam"}, "set": {"tag": "reviewed"}},
+    )
+    report = resp.get_json()["data"]
+    assert report == {"matched": 5, "modified": 5, "chunks": 3, "next": None}
+    assert repo.collection.count_documents({"tag": "reviewed"}) == 5
+    assert repo.collection.count_documents({"tag": "ok"}) == 1
+
+
+def test_bulk_delete_by_ids_and_filter(client, repo):
+    ids = [repo.create_post({"title": "t", "content": "c"}) for _ in range(3)]
+    repo.create_post({"title": "t", "content": "x" * 40, "tag": "spam"})
+    repo.create_post({"title": "t", "content": "c", "tag": "spam"})
+    missing = "64b000000000000000000000"
+
+    resp = client.post("/posts/bulk/delete", json={"ids": ids + [missing]})
+    report = resp.get_json()["data"]
+    assert report["deleted"] == 3
+    assert report["not_found"] == [missing]
+
+    resp = client.post("/posts/bulk/delete", json={"filter": {"tag": "spam"}})
+    report = resp.get_json()["data"]
+    assert report == {"matched": 2, "deleted": 2, "chunks": 1, "next": None}
+    assert repo.collection.count_documents({}) == 0
+    assert _live_chunks(repo) == 0
+
+
+def test_bulk_filter_sweep_with_zero_chunk_size(client, repo, monkeypatch):
+    monkeypatch.setattr(repo._config, "BULK_CHUNK_SIZE", 0)
+    for i in range(3):
+        repo.create_post({"title": f"t{i}", "content": "c", "tag": "spam"})
+    resp = client.post("/posts/bulk/delete", json={"filter": {"tag": "spam"}})
+    assert resp.status_code == 200
+    assert resp.get_json()["data"]["deleted"] == 3
+
+
+@pytest.mark.parametrize("path", ["/posts/bulk/update", "/posts/bulk/delete"])
+def test_bulk_filter_sweep_is_capped_and_resumable(client, repo, path):
+    for i in range(12):
+        repo.create_post({"title": f"t{i}", "content": "c", "tag": "spam"})
+    body = {"filter": {"tag": "spam"}}
+    if path.endswith("update"):
+        body["set"] = {"status": "hidden"}
+
+    first = client.post(path, json=body).get_json()["data"]
+    assert first["matched"] == 10
+    assert first["next"] is not None
+    second = client.post(path, json={**body, "after": first["next"]})
+    second = second.get_json()["data"]
+    assert second["matched"] == 2
+    assert second["next"] is None
+
+
+@pytest.mark.parametrize(
+    "path, body",
+    [
+        ("/posts/bulk/update", {"filter": {"$where": "1"}, "set": {"a": 1}}),
+        ("/posts/bulk/update", {"filter": {"tag": {"$regex": "x"}}, "set": {"a": 1}}),
+        ("/posts/bulk/update", {"filter": {"tag": "x"}, "set": {"content": "y"}}),
+        ("/posts/bulk/update", {"items": [{"id": "bad", "set": {"a": 1}}]}),
+        ("/posts/bulk/update", {"filter": {"tag": "x"}, "set": {"content.evil": 1}}),
+        ("/posts/bulk/update", {"filter": {"a": 1}, "unset": ["content_file_id.x"]}),
+        ("/posts/bulk/update", {"filter": {"tag": "x"}, "set": {"_id.x": 1}}),
+        ("/posts/bulk/update", {"filter": {"tag": "x"}, "unset": ["title.x"]}),
+        ("/posts/bulk/delete", {"filter": {"_id.x": 1}}),
+        ("/posts/bulk/delete", {"filter": {}}),
+        ("/posts/bulk/delete", {"filter": {"tag": "x"}, "after": "bad"}),
+        ("/posts/bulk/delete", {"ids": ["64b000000000000000000000"] * 11}),
+    ],
+)
+def test_bulk_rejects_invalid_input(client, path, body):
+    resp = client.post(path, json=body)
+    assert resp.status_code == 422
+
+
+def _sse_events(resp):
+    events = []
+    for block in resp.get_data(as_text=True).split("\n\n"):
+        fields = dict(
+            line.split(": ", 1) for line in block.splitlines() if ": " in line
+        )
+        if "event" in fields:
+            events.append(fields)
+    return events
+
+
+def test_change_feed_from_event_bus(client, repo):
+    first = repo.create_post({"title": "t", "content": "c"})
+    repo.update_post(first, {"title": "t2", "content": "c"})
+    repo.delete_post(first)
+    token = f"bus.{repo.post_events.id}.0"
+
+    resp = client.get("/posts/changes", headers={"Last-Event-ID": token})
+    assert resp.mimetype == "text/event-stream"
+    events = _sse_events(resp)
+    assert [e["event"] for e in events] == ["create", "update", "delete"]
+    assert events[-1]["id"] == f"bus.{repo.post_events.id}.3"
+
+    resp = client.get(f"/posts/changes?ops=delete&resume_token={token}")
+    assert [e["event"] for e in _sse_events(resp)] == ["delete"]
+
+
+def test_change_feed_resume_past_buffer_resets(client, repo, monkeypatch):
+    from app.core.services import post_service
+
+    monkeypatch.setattr(post_service._config, "CHANGE_FEED_BUFFER_SIZE", 2)
+    token = f"bus.{repo.post_events.id}.{repo.post_events.stats()['seq']}"
+    for _ in range(5):
+        repo.create_post({"title": "t", "content": "c"})
+
+    # The backlog no longer fits the buffer: resync instead of overflowing again
+    for _ in range(2):
+        resp = client.get("/posts/changes", headers={"Last-Event-ID": token})
+        assert [e["event"] for e in _sse_events(resp)] == ["reset"]
+
+    # A consumer falling behind mid-stream is told to resync before closing
+    events = post_service.stream_post_changes()
+    assert next(events) is None
+    for _ in range(3):
+        repo.create_post({"title": "t", "content": "c"})
+    assert next(events)["op"] == "reset"
+    assert list(events) == []
+    assert repo.post_events.stats()["subscribers"] == 0
+
+
+def test_change_feed_unknown_token_and_ops(client, repo):
+    resp = client.get("/posts/changes", headers={"Last-Event-ID": "bus.other.5"})
+    assert [e["event"] for e in _sse_events(resp)] == ["reset"]
+
+    resp = client.get("/posts/changes?ops=drop")
+    assert resp.status_code == 422
+
+
+def test_change_feed_head_opens_nothing(client, repo, monkeypatch):
+    from app.core.services import post_service
+
+    for _ in range(3):
+        assert client.head("/posts/changes").status_code == 200
+    assert repo.post_events.stats()["subscribers"] == 0
+
+    watched = []
+    monkeypatch.setattr(repo.collection, "watch", watched.append, raising=False)
+    monkeypatch.setattr(post_service._config, "CHANGE_FEED_SOURCE", "change_stream")
+    assert client.head("/posts/changes").status_code == 200
+    assert watched == []
+
+
+def test_change_feed_auto_falls_back_without_change_streams(
+    client, repo, monkeypatch
+):
+    from app.core.services import post_service
+
+    def watch(*args, **kwargs):
+        raise OperationFailure("replica sets only", code=40573)
+
+    # Server standalone: change streams ditolak, feed pakai event bus
+    monkeypatch.setattr(repo.collection, "watch", watch, raising=False)
+    monkeypatch.setattr(post_service._config, "CHANGE_FEED_SOURCE", "auto")
+    monkeypatch.setitem(post_service._change_feed_state, "change_streams", None)
+    token = f"bus.{repo.post_events.id}.0"
+    repo.create_post({"title": "t", "content": "c"})
+
+    resp = client.get("/posts/changes", headers={"Last-Event-ID": token})
+    assert [e["event"] for e in _sse_events(resp)] == ["create"]
+    assert post_service._change_feed_state["change_streams"] is False
+
+
+class _FakeChangeStream:
+    def __init__(self, changes):
+        self.changes = list(changes)
+        self.alive = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.alive = False
+
+    def try_next(self):
+        return self.changes.pop(0) if self.changes else None
+
+
+def test_change_feed_from_change_stream(client, repo, monkeypatch):
+    from bson import ObjectId
+    from app.core.services import post_service
+
+    post_id = ObjectId()
+    calls = []
+
+    def watch(pipeline, resume_after=None, max_await_time_ms=None):
+        calls.append((pipeline, resume_after))
+        change = {
+            "_id": {"_data": "8265AB"},
+            "operationType": "replace",
+            "documentKey": {"_id": post_id},
+        }
+        return _FakeChangeStream([change])
+
+    monkeypatch.setattr(repo.collection, "watch", watch, raising=False)
+    monkeypatch.setattr(post_service._config, "CHANGE_FEED_SOURCE", "change_stream")
+
+    resp = client.get("/posts/changes?ops=update", headers={"Last-Event-ID": "cs.01"})
+    events = _sse_events(resp)
+    assert events[0]["event"] == "update"
+    assert events[0]["id"] == "cs.8265AB"
+    assert str(post_id) in events[0]["data"]
+    pipeline, resume_after = calls[0]
+    assert resume_after == {"_data": "01"}
+    assert pipeline[0]["$match"]["operationType"]["$in"] == ["update", "replace"]
+
+
+def _count_posts_by_day(repo):
+    # mongomock belum mendukung $convert, hitung manual dari ObjectId
+    stats_repo = repo.stats_repo
+    counts = {}
+    for doc in stats_repo.posts.find({}, {"_id": 1}):
+        day = stats_repo.creation_day(doc["_id"])
+        counts[day] = counts.get(day, 0) + 1
+    return counts
+
+
+def test_stats_counters_follow_writes(client, repo):
+    ids = [repo.create_post({"title": "t", "content": "c"}) for _ in range(4)]
+    repo.delete_post(ids[0])
+    repo.create_post({"title": "t", "content": "c", "tag": "spam"})
+    client.post("/posts/bulk/delete", json={"filter": {"tag": "spam"}})
+
+    resp = client.get("/posts/stats?days=7")
+    data = resp.get_json()["data"]
+    assert data["total"] == 3
+    assert len(data["daily"]) == 7
+    assert data["daily"][-1]["count"] == 3
+    assert sum(day["count"] for day in data["daily"][:-1]) == 0
+
+    assert client.get("/posts/stats?days=0").status_code == 422
+    assert client.get("/posts/stats?days=abc").status_code == 422
+
+
+def test_count_posts_by_day_pipeline(repo, monkeypatch):
+    # mongomock cannot run $convert, so check the pipeline sent to the server
+    stats_repo = repo.stats_repo
+    pipelines = []
+
+    def aggregate(pipeline):
+        pipelines.append(pipeline)
+        return [{"_id": "2024-01-02", "count": 3}, {"_id": None, "count": 1}]
+
+    monkeypatch.setattr(stats_repo.posts, "aggregate", aggregate)
+    assert stats_repo.count_posts_by_day() == {"2024-01-02": 3, None: 1}
+    (stage,) = pipelines[0]
+    day = stage["$group"]["_id"]["$dateToString"]
+    assert day["format"] == "%Y-%m-%d"
+    assert day["date"]["$convert"] == {
+        "input": "$_id",
+        "to": "date",
+        "onError": None,
+        "onNull": None,
+    }
+    assert stage["$group"]["count"] == {"$sum": 1}
+
+
+def test_stats_rebuild_repairs_drift(repo, monkeypatch):
+    from bson import ObjectId
+
+    stats_repo = repo.stats_repo
+    monkeypatch.setattr(
+        stats_repo, "count_posts_by_day", lambda: _count_posts_by_day(repo)
+    )
+    repo.create_post({"title": "t", "content": "c"})
+    old_id = ObjectId.from_datetime(datetime(2024, 1, 2, tzinfo=timezone.utc))
+    # Ditulis langsung tanpa repository, jadi counter tidak ikut naik
+    stats_repo.posts.insert_one({"_id": old_id, "title": "old", "content": "c"})
+    stats_repo.stats.insert_one(
+        {"_id": "day:2000-01-01", "day": "2000-01-01", "count": 5}
+    )
+
+    assert stats_repo.rebuild() == {"total": 2, "days": 2}
+    assert stats_repo.stats.find_one({"_id": "total"})["count"] == 2
+    assert stats_repo.stats.find_one({"_id": "day:2024-01-02"})["count"] == 1
+    assert stats_repo.stats.find_one({"_id": "day:2000-01-01"}) is None
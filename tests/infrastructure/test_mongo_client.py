@@ -45,3 +45,60 @@ def test_extract_db_name_from_uri():
 #     monkeypatch.setenv("DB_NAME", "env_db")
 #     from app.infrastructure.db.mongo_client import MongoDB
 #     assert MongoDB._get_db_name_from_config() == "env_db"
+
+class _PolicyConfig:
+    MONGO_READ_PREFERENCES = {"get": "nearest"}
+    MONGO_WRITE_CONCERNS = {"create": "1", "delete": "majority"}
+    MONGO_MAX_STALENESS_SECONDS = 120
+
+@pytest.fixture
+def replica_set_mock():
+    # Stand-in replica set: mongomock client dengan URI multi-host + replicaSet
+    uri = (
+        "mongodb://localhost:27017,localhost:27018,localhost:27019"
+        "/rs_db?replicaSet=rs0"
+    )
+    mongo = MongoDB(uri=uri, client_class=mongomock.MongoClient)
+    mongo.connect()
+    yield mongo
+
+def test_get_collection_for_read_policy(replica_set_mock):
+    col = replica_set_mock.get_collection_for("posts", "get", config=_PolicyConfig)
+    assert col.read_preference.name == "Nearest"
+    assert col.read_preference.max_staleness == 120
+    col.insert_one({"title": "a"})
+    assert col.find_one({"title": "a"}) is not None
+
+def test_get_collection_for_write_policy(replica_set_mock):
+    create_col = replica_set_mock.get_collection_for(
+        "posts", "create", config=_PolicyConfig
+    )
+    delete_col = replica_set_mock.get_collection_for(
+        "posts", "delete", config=_PolicyConfig
+    )
+    assert create_col.write_concern.document == {"w": 1}
+    assert delete_col.write_concern.document == {"w": "majority"}
+    # Views share the same underlying data
+    create_col.insert_one({"title": "b"})
+    assert delete_col.delete_one({"title": "b"}).deleted_count == 1
+
+def test_get_collection_for_unconfigured_operation(replica_set_mock):
+    col = replica_set_mock.get_collection_for("posts", "update", config=_PolicyConfig)
+    assert col.read_preference.name == "Primary"
+
+def test_build_read_preference_and_write_concern():
+    from app.infrastructure.db.mongo_client import (
+        build_read_preference,
+        build_write_concern,
+    )
+    assert build_read_preference("") is None
+    assert build_read_preference("primary", 120).max_staleness == -1
+    assert build_read_preference("secondaryPreferred", 90).max_staleness == 90
+    assert build_write_concern("") is None
+    assert build_write_concern("1").document == {"w": 1}
+    with pytest.raises(ValueError):
+        build_read_preference("fastest")
+    with pytest.raises(ValueError):
+        build_read_preference("nearest", 30)
+    with pytest.raises(ValueError):
+        build_write_concern("all")
@@ -0,0 +1,76 @@
+import threading
+
+import pytest
+
+from app.utils.event_bus import EventBus, SubscriptionOverflow, get_stats
+
+
+def test_publish_reaches_filtered_subscribers():
+    bus = EventBus("test.filtered")
+    all_sub, _ = bus.subscribe()
+    delete_sub, _ = bus.subscribe(ops=["delete"])
+    bus.publish({"op": "create", "id": "a"})
+    bus.publish({"op": "delete", "id": "a"})
+
+    assert all_sub.get(0)["op"] == "create"
+    assert all_sub.get(0)["op"] == "delete"
+    assert delete_sub.get(0) == {"op": "delete", "id": "a", "seq": 2}
+    assert delete_sub.get(0) is None
+
+
+def test_get_waits_for_publish():
+    bus = EventBus("test.wait")
+    sub, _ = bus.subscribe()
+    timer = threading.Timer(0.05, bus.publish, args=({"op": "update", "id": "x"},))
+    timer.start()
+    assert sub.get(timeout=5)["id"] == "x"
+    timer.join()
+
+
+def test_resume_replays_history():
+    bus = EventBus("test.resume", history_size=3)
+    for i in range(5):
+        bus.publish({"op": "create", "id": str(i)})
+
+    sub, resumed = bus.subscribe(after=3)
+    assert resumed is True
+    assert [sub.get(0)["seq"], sub.get(0)["seq"]] == [4, 5]
+
+    # seq 1 already fell out of the history
+    sub, resumed = bus.subscribe(after=1)
+    assert resumed is False
+    assert sub.get(0) is None
+
+
+def test_resume_past_buffer_size_starts_from_now():
+    bus = EventBus("test.resume_overflow")
+    for i in range(5):
+        bus.publish({"op": "create", "id": str(i)})
+
+    sub, resumed = bus.subscribe(after=0, buffer_size=2)
+    assert resumed is False
+    assert sub.get(0) is None
+    bus.publish({"op": "create", "id": "5"})
+    assert sub.get(0)["seq"] == 6
+
+    # Only events matching the ops filter count against the buffer
+    sub, resumed = bus.subscribe(ops=["delete"], after=0, buffer_size=2)
+    assert resumed is True
+    assert sub.get(0) is None
+
+
+def test_slow_subscriber_is_dropped():
+    bus = EventBus("test.overflow")
+    slow, _ = bus.subscribe(buffer_size=2)
+    fast, _ = bus.subscribe(buffer_size=10)
+    for i in range(3):
+        bus.publish({"op": "create", "id": str(i)})
+
+    with pytest.raises(SubscriptionOverflow):
+        slow.get(0)
+    assert fast.get(0)["id"] == "0"
+    stats = get_stats()["test.overflow"]
+    assert stats["overflowed"] == 1
+    assert stats["subscribers"] == 1
+    fast.close()
+    assert bus.stats()["subscribers"] == 0
@@ -0,0 +1,120 @@
+import threading
+import time
+
+import pytest
+
+from app.utils.singleflight import SingleFlight, get_stats
+
+
+def _run_concurrently(group, key, fn, n):
+    results, errors = [], []
+
+    def worker():
+        try:
+            results.append(group.do(key, fn))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(n)]
+    for t in threads:
+        t.start()
+    return threads, results, errors
+
+
+def _wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() >= deadline:
+            raise AssertionError("Timed out waiting for condition")
+        time.sleep(0.001)
+
+
+def test_concurrent_calls_share_one_execution():
+    group = SingleFlight("test.shared")
+    release = threading.Event()
+    executions = []
+
+    def fetch():
+        executions.append(1)
+        release.wait(timeout=5)
+        return {"title": "viral"}
+
+    threads, results, errors = _run_concurrently(group, "post-1", fetch, 10)
+    # Wait until every follower is parked behind the leader
+    _wait_for(lambda: group.stats()["calls"] == 10)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert len(executions) == 1
+    assert errors == []
+    assert results == [{"title": "viral"}] * 10
+    stats = group.stats()
+    assert stats["executions"] == 1
+    assert stats["coalesced"] == 9
+    assert stats["in_flight"] == 0
+
+
+def test_error_is_propagated_to_all_waiters():
+    group = SingleFlight("test.error")
+    release = threading.Event()
+
+    def fetch():
+        release.wait(timeout=5)
+        raise RuntimeError("db down")
+
+    threads, results, errors = _run_concurrently(group, "post-1", fetch, 5)
+    _wait_for(lambda: group.stats()["calls"] == 5)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert results == []
+    assert len(errors) == 5
+    assert all(str(e) == "db down" for e in errors)
+    assert group.stats()["errors"] == 1
+
+
+def test_sequential_calls_are_not_coalesced():
+    group = SingleFlight("test.sequential")
+    assert group.do("a", lambda: 1) == 1
+    assert group.do("a", lambda: 2) == 2
+    with pytest.raises(ValueError):
+        group.do("a", lambda: int("x"))
+    stats = group.stats()
+    assert stats["executions"] == 3
+    assert stats["coalesced"] == 0
+
+
+def test_forget_starts_a_fresh_call():
+    group = SingleFlight("test.forget")
+    release = threading.Event()
+    started = threading.Event()
+    values = iter(["stale", "fresh"])
+
+    def fetch():
+        value = next(values)
+        if value == "stale":
+            started.set()
+            release.wait(timeout=5)
+        return value
+
+    threads, results, _ = _run_concurrently(group, "post-1", fetch, 1)
+    assert started.wait(timeout=5)
+    group.forget("post-1")
+    # A caller arriving after forget does not join the stale call
+    assert group.do("post-1", fetch) == "fresh"
+    release.set()
+    for t in threads:
+        t.join()
+    assert results == ["stale"]
+    stats = group.stats()
+    assert stats["forgotten"] == 1
+    assert stats["coalesced"] == 0
+    assert stats["in_flight"] == 0
+
+
+def test_get_stats_reports_registered_groups():
+    group = SingleFlight("test.registry")
+    group.do("a", lambda: None)
+    assert get_stats()["test.registry"]["calls"] == 1